@@ -0,0 +1,283 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import asyncio
+import errno
+import logging
+import os
+import time
+import psutil
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+PROC_SELF_CGROUP = '/proc/self/cgroup'
+
+@dataclass
+class CgroupMetrics:
+    """Data class for storing metrics of a single cgroup
+
+    Metrics whose controller is not enabled for the cgroup are None.
+    """
+    timestamp: datetime
+    cgroup: str
+    cpu_percent: Optional[float]
+    cpu_limit: float
+    memory_current: Optional[int]
+    memory_max: Optional[int]
+    memory_percent: Optional[float]
+    io_read: Optional[float]
+    io_write: Optional[float]
+    cpu_pressure_some: Optional[float]
+    cpu_pressure_full: Optional[float]
+
+    def to_dict(self) -> Dict:
+        return {
+            'timestamp': self.timestamp.isoformat(),
+            'cgroup': self.cgroup,
+            'cpu_percent': self.cpu_percent,
+            'cpu_limit': self.cpu_limit,
+            'memory_current': self.memory_current,
+            'memory_max': self.memory_max,
+            'memory_percent': self.memory_percent,
+            'io_read': self.io_read,
+            'io_write': self.io_write,
+            'cpu_pressure_some': self.cpu_pressure_some,
+            'cpu_pressure_full': self.cpu_pressure_full
+        }
+
+def current_cgroup(proc_path: str = PROC_SELF_CGROUP) -> str:
+    """Get the cgroup v2 path of the current process"""
+    with open(proc_path, 'r') as f:
+        for line in f:
+            hierarchy, _, path = line.rstrip('\n').split(':', 2)
+            if hierarchy == '0':
+                return path
+    raise ValueError(f"No cgroup v2 entry found in {proc_path}")
+
+class CgroupReader:
+    """Reads the control files of one cgroup through file descriptors kept open between ticks"""
+    FILES = ('cpu.stat', 'cpu.max', 'memory.current', 'memory.max', 'io.stat', 'cpu.pressure')
+    # Failing to read these means the cgroup itself is gone
+    CORE_FILES = ('cpu.stat', 'memory.current')
+    READ_SIZE = 4096
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fds: Dict[str, int] = {}
+        self._last_cpu: Optional[Tuple[int, float]] = None
+        self._last_io: Optional[Tuple[int, int, float]] = None
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Cgroup directory not found: {path}")
+        try:
+            for name in self.FILES:
+                try:
+                    self._fds[name] = os.open(os.path.join(path, name), os.O_RDONLY)
+                except FileNotFoundError:
+                    # Controllers that are not enabled for this cgroup have no files
+                    logging.debug(f"{name} not available in {path}")
+        except OSError:
+            self.close()
+            raise
+
+    def _read(self, name: str) -> Optional[str]:
+        """Read a control file from offset 0 without reopening it"""
+        fd = self._fds.get(name)
+        if fd is None:
+            return None
+        chunks = []
+        offset = 0
+        try:
+            while True:
+                chunk = os.pread(fd, self.READ_SIZE, offset)
+                chunks.append(chunk)
+                if len(chunk) < self.READ_SIZE:
+                    break
+                offset += len(chunk)
+        except OSError as e:
+            if name in self.CORE_FILES and e.errno in (errno.ENODEV, errno.ENOENT):
+                raise
+            # e.g. cpu.pressure fails with EOPNOTSUPP when PSI is disabled; stop
+            # reading this file but keep the rest of the cgroup and its deltas
+            logging.warning(f"Disabling {name} for {self.path}: {str(e)}")
+            os.close(self._fds.pop(name))
+            return None
+        return b''.join(chunks).decode()
+
+    @staticmethod
+    def _parse_flat_keyed(content: str) -> Dict[str, int]:
+        """Parse 'key value' lines such as cpu.stat"""
+        result = {}
+        for line in content.splitlines():
+            key, _, value = line.partition(' ')
+            if value:
+                result[key] = int(value)
+        return result
+
+    def _cpu_limit(self) -> float:
+        """Get the CPU quota in number of CPUs, or the host CPU count if unlimited"""
+        content = self._read('cpu.max')
+        fields = content.split() if content else []
+        if len(fields) == 2 and fields[0] != 'max':
+            return int(fields[0]) / int(fields[1])
+        return float(os.cpu_count() or 1)
+
+    def _cpu_usage(self, now: float) -> Tuple[Optional[float], float]:
+        """Calculate CPU usage as a percentage of the cgroup quota, and the quota itself"""
+        # cpu.stat is read first so a removed cgroup fails before optional files are touched
+        content = self._read('cpu.stat')
+        cpu_limit = self._cpu_limit()
+        if content is None:
+            return None, cpu_limit
+        usage_usec = self._parse_flat_keyed(content).get('usage_usec', 0)
+
+        percent = 0.0
+        if self._last_cpu is not None:
+            time_delta = now - self._last_cpu[1]
+            if time_delta > 0:
+                used = (usage_usec - self._last_cpu[0]) / 1_000_000
+                percent = max(0.0, min(used / time_delta / cpu_limit * 100, 100.0))
+        self._last_cpu = (usage_usec, now)
+        return percent, cpu_limit
+
+    def _memory_usage(self, host_memory: int) -> Tuple[Optional[int], Optional[int], Optional[float]]:
+        """Get current memory, memory limit and usage relative to the limit or host memory"""
+        current = self._read('memory.current')
+        if current is None:
+            return None, None, None
+        limit = self._read('memory.max')
+        memory_current = int(current)
+        memory_max = int(limit) if limit and limit.strip() != 'max' else None
+
+        total = memory_max or host_memory
+        return memory_current, memory_max, memory_current / total * 100 if total else 0.0
+
+    def _io_usage(self, now: float) -> Tuple[Optional[float], Optional[float]]:
+        """Calculate IO throughput in MB/s summed over all devices"""
+        content = self._read('io.stat')
+        if content is None:
+            return None, None
+
+        read_bytes = write_bytes = 0
+        for line in content.splitlines():
+            for field in line.split()[1:]:
+                key, _, value = field.partition('=')
+                if key == 'rbytes':
+                    read_bytes += int(value)
+                elif key == 'wbytes':
+                    write_bytes += int(value)
+
+        read_speed = write_speed = 0.0
+        if self._last_io is not None:
+            time_delta = now - self._last_io[2]
+            if time_delta > 0:
+                read_speed = max(0, (read_bytes - self._last_io[0]) / time_delta / 1024 / 1024)
+                write_speed = max(0, (write_bytes - self._last_io[1]) / time_delta / 1024 / 1024)
+        self._last_io = (read_bytes, write_bytes, now)
+        return read_speed, write_speed
+
+    def _cpu_pressure(self) -> Tuple[Optional[float], Optional[float]]:
+        """Get the 10 second 'some' and 'full' CPU pressure averages"""
+        content = self._read('cpu.pressure')
+        if content is None:
+            return None, None
+
+        pressure = {}
+        for line in content.splitlines():
+            kind, *fields = line.split()
+            for field in fields:
+                key, _, value = field.partition('=')
+                if key == 'avg10':
+                    pressure[kind] = float(value)
+        return pressure.get('some'), pressure.get('full')
+
+    def read(self, name: str, host_memory: int) -> CgroupMetrics:
+        """Read all metrics of this cgroup"""
+        now = time.monotonic()
+        cpu_percent, cpu_limit = self._cpu_usage(now)
+        memory_current, memory_max, memory_percent = self._memory_usage(host_memory)
+        io_read, io_write = self._io_usage(now)
+        pressure_some, pressure_full = self._cpu_pressure()
+
+        return CgroupMetrics(
+            timestamp=datetime.now(),
+            cgroup=name,
+            cpu_percent=cpu_percent,
+            cpu_limit=cpu_limit,
+            memory_current=memory_current,
+            memory_max=memory_max,
+            memory_percent=memory_percent,
+            io_read=io_read,
+            io_write=io_write,
+            cpu_pressure_some=pressure_some,
+            cpu_pressure_full=pressure_full
+        )
+
+    def close(self) -> None:
+        """Close all open file descriptors"""
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+
+class CgroupMetricsCollector:
+    """Collects metrics for the current cgroup or a configured set of cgroups"""
+    def __init__(self, cgroups: Optional[List[str]] = None, root: str = CGROUP_ROOT,
+                 proc_path: str = PROC_SELF_CGROUP, host_memory: Optional[int] = None):
+        self.root = root
+        # Host memory only changes on hotplug, so read it once rather than per cgroup per tick
+        self.host_memory = host_memory if host_memory is not None else psutil.virtual_memory().total
+        self.cgroups = cgroups if cgroups is not None else [current_cgroup(proc_path)]
+        self._readers: Dict[str, CgroupReader] = {}
+        self._failing: Set[str] = set()
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _get_reader(self, cgroup: str) -> CgroupReader:
+        reader = self._readers.get(cgroup)
+        if reader is None:
+            reader = CgroupReader(os.path.join(self.root, cgroup.lstrip('/')))
+            self._readers[cgroup] = reader
+        return reader
+
+    def _report_failure(self, cgroup: str, error: Exception) -> None:
+        """Warn the first time a cgroup fails and only log at debug level until it recovers"""
+        if cgroup in self._failing:
+            logging.debug(f"Cgroup {cgroup} still unavailable: {str(error)}")
+        else:
+            logging.warning(f"Error reading cgroup {cgroup}: {str(error)}")
+            self._failing.add(cgroup)
+
+    def _collect_all(self) -> List[CgroupMetrics]:
+        """Read every configured cgroup in a single pass"""
+        results = []
+        with self._lock:
+            for cgroup in self.cgroups:
+                try:
+                    results.append(self._get_reader(cgroup).read(cgroup, self.host_memory))
+                except OSError as e:
+                    # The cgroup was removed; reopen it on a later tick
+                    self._report_failure(cgroup, e)
+                    reader = self._readers.pop(cgroup, None)
+                    if reader:
+                        reader.close()
+                except ValueError as e:
+                    # Malformed data; skip this tick but keep the open descriptors
+                    self._report_failure(cgroup, e)
+                else:
+                    if cgroup in self._failing:
+                        logging.info(f"Cgroup {cgroup} is readable again")
+                        self._failing.discard(cgroup)
+        return results
+
+    async def collect(self) -> List[CgroupMetrics]:
+        """Collect metrics for all configured cgroups"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, self._collect_all)
+
+    def close(self) -> None:
+        """Close all cgroup readers"""
+        with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+        self._executor.shutdown(wait=True)
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import psutil
 import logging
 from concurrent.futures import ThreadPoolExecutor
@@ -8,7 +8,10 @@ from threading import Lock
 from abc import ABC, abstractmethod
 from queue import Queue
 import asyncio
-from storage.repository import MetricsRepository
+
+if TYPE_CHECKING:
+    from core.cgroup import CgroupMetrics, CgroupMetricsCollector
+    from storage.repository import MetricsRepository
 
 @dataclass
 class SystemMetrics:
@@ -174,9 +177,12 @@ class AlertManager:
 
 class SystemMonitor:
     """Main system monitoring class"""
-    def __init__(self, repository: Optional[MetricsRepository] = None):
+    def __init__(self, repository: Optional['MetricsRepository'] = None,
+                 cgroup_collector: Optional['CgroupMetricsCollector'] = None):
         self.metrics_collector = MetricsCollector()
         self.metrics_buffer = MetricsBuffer()
+        self.cgroup_collector = cgroup_collector
+        self._cgroup_metrics: List['CgroupMetrics'] = []
         self.alert_manager = AlertManager()
         self.repository = repository
         self.running = False
@@ -195,12 +201,20 @@ class SystemMonitor:
                 # Store in buffer
                 self.metrics_buffer.add(metrics)
 
+                # Collect per-container metrics if cgroups are configured
+                if self.cgroup_collector:
+                    self._cgroup_metrics = await self.cgroup_collector.collect()
+
                 # Check alerts
                 self.alert_manager.check_alerts(metrics)
 
                 # Save to database if repository is available
                 if self.repository:
                     await self.repository.save_metrics(metrics.to_dict())
+                    if self._cgroup_metrics:
+                        await self.repository.save_cgroup_metrics(
+                            [cgroup_metrics.to_dict() for cgroup_metrics in self._cgroup_metrics]
+                        )
 
                     # Save any new alerts
                     alerts = self.get_alerts()
@@ -221,12 +235,18 @@ class SystemMonitor:
         """Stop monitoring system"""
         self.running = False
         self._executor.shutdown(wait=True)
+        if self.cgroup_collector:
+            self.cgroup_collector.close()
 
     def get_current_metrics(self) -> Optional[SystemMetrics]:
         """Get most recent metrics"""
         last_metrics = self.metrics_buffer.get_last_n(1)
         return last_metrics[0] if last_metrics else None
 
+    def get_current_cgroup_metrics(self) -> List['CgroupMetrics']:
+        """Get most recent metrics of the monitored cgroups"""
+        return self._cgroup_metrics
+
     def get_metrics_history(self, seconds: int) -> List[SystemMetrics]:
         """Get historical metrics"""
         return self.metrics_buffer.get_last_n(seconds)
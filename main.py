@@ -1,9 +1,16 @@
 import asyncio
+import argparse
 import logging
-from ui.dashboard import Dashboard
+import threading
+from typing import TYPE_CHECKING
+from core.cgroup import CgroupMetricsCollector, current_cgroup
 from core.monitor import SystemMonitor
 from storage.repository import MetricsRepository
-import threading
+
+if TYPE_CHECKING:
+    # The UI stack (tkinter, matplotlib, seaborn) is only imported when the
+    # dashboard is actually started, keeping headless collector startup cheap
+    from ui.dashboard import Dashboard
 
 # Configure logging
 logging.basicConfig(
@@ -15,7 +22,7 @@ logging.basicConfig(
     ]
 )
 
-async def update_gui(dashboard: Dashboard, monitor: SystemMonitor):
+async def update_gui(dashboard: 'Dashboard', monitor: SystemMonitor):
     """Update GUI periodically"""
     while True:
         try:
@@ -32,13 +39,54 @@ def run_async_loop(async_loop):
     asyncio.set_event_loop(async_loop)
     async_loop.run_forever()
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="System Performance Monitor")
+    parser.add_argument(
+        '--headless',
+        action='store_true',
+        help="Collect and store metrics without starting the dashboard"
+    )
+    parser.add_argument(
+        '--cgroup',
+        action='append',
+        nargs='?',
+        const='',
+        metavar='PATH',
+        help="Also collect cgroup v2 metrics for PATH (relative to /sys/fs/cgroup); "
+             "without PATH, the agent's own cgroup. May be repeated"
+    )
+    return parser.parse_args()
+
+def run_headless(monitor: SystemMonitor):
+    """Run the collector without loading the UI stack"""
+    try:
+        asyncio.run(monitor.start())
+    except KeyboardInterrupt:
+        logging.info("Collector stopped")
+
 def main():
+    args = parse_args()
     try:
         # Initialize repository
         repository = MetricsRepository()
 
+        # Initialize container metrics collector for the configured cgroups
+        cgroup_collector = None
+        if args.cgroup is not None:
+            cgroup_collector = CgroupMetricsCollector(
+                [cgroup or current_cgroup() for cgroup in args.cgroup]
+            )
+
         # Initialize monitor with repository
-        monitor = SystemMonitor(repository=repository)
+        monitor = SystemMonitor(repository=repository, cgroup_collector=cgroup_collector)
+
+        if args.headless:
+            run_headless(monitor)
+            return
+
+        # Import the dashboard lazily so the UI stack only loads when needed
+        from ui.dashboard import Dashboard
 
         # Initialize dashboard
         dashboard = Dashboard(monitor, repository)
@@ -1,8 +1,7 @@
 import sqlite3
 import logging
-import aiosqlite
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from contextlib import asynccontextmanager
 
 class MetricsRepository:
@@ -36,6 +35,28 @@ class MetricsRepository:
 
                 # Create index for better query performance
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_metrics_timestamp ON metrics(timestamp)")
+
+                # Per-cgroup metrics; columns are NULL when a controller is disabled
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS cgroup_metrics (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        timestamp DATETIME NOT NULL,
+                        cgroup TEXT NOT NULL,
+                        cpu_percent REAL,
+                        cpu_limit REAL NOT NULL,
+                        memory_current INTEGER,
+                        memory_max INTEGER,
+                        memory_percent REAL,
+                        io_read REAL,
+                        io_write REAL,
+                        cpu_pressure_some REAL,
+                        cpu_pressure_full REAL
+                    )
+                """)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_cgroup_metrics_cgroup_timestamp "
+                    "ON cgroup_metrics(cgroup, timestamp)"
+                )
                 conn.commit()
                 logging.info("Database initialized successfully")
 
@@ -46,6 +67,8 @@ class MetricsRepository:
     @asynccontextmanager
     async def _get_db(self):
         """Async context manager for database connections"""
+        import aiosqlite  # Deferred until the first write to keep startup fast
+
         async with aiosqlite.connect(self.db_path) as db:
             db.row_factory = aiosqlite.Row
             yield db
@@ -69,6 +92,34 @@ class MetricsRepository:
             await db.commit()
             logging.debug("Metrics saved successfully")
 
+    async def save_cgroup_metrics(self, metrics: List[Dict[str, Any]]) -> None:
+        """Save metrics of several cgroups to database in one transaction"""
+        async with self._get_db() as db:
+            await db.executemany("""
+                INSERT INTO cgroup_metrics (
+                    timestamp, cgroup, cpu_percent, cpu_limit, memory_current,
+                    memory_max, memory_percent, io_read, io_write,
+                    cpu_pressure_some, cpu_pressure_full
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    datetime.now(),
+                    m['cgroup'],
+                    m['cpu_percent'],
+                    m['cpu_limit'],
+                    m['memory_current'],
+                    m['memory_max'],
+                    m['memory_percent'],
+                    m['io_read'],
+                    m['io_write'],
+                    m['cpu_pressure_some'],
+                    m['cpu_pressure_full']
+                )
+                for m in metrics
+            ])
+            await db.commit()
+            logging.debug("Cgroup metrics saved successfully")
+
     async def get_latest_metrics(self) -> Optional[Dict[str, Any]]:
         """Get the most recent metrics"""
         async with self._get_db() as db:
@@ -0,0 +1,204 @@
+import asyncio
+import errno
+import os
+import shutil
+
+import pytest
+
+import core.cgroup
+from core.cgroup import CgroupMetricsCollector, current_cgroup
+
+HOST_MEMORY = 8 * 1024 ** 3
+
+def write_cgroup(path, cpu_usage_usec=0, cpu_max="50000 100000", memory_current=1048576,
+                 memory_max="2097152", rbytes=0, wbytes=0,
+                 pressure=(1.5, 0.25)):
+    """Write a fake cgroup v2 directory"""
+    os.makedirs(path, exist_ok=True)
+    files = {
+        'cpu.stat': f"usage_usec {cpu_usage_usec}\nuser_usec 0\nsystem_usec 0\n",
+        'cpu.max': f"{cpu_max}\n",
+        'memory.current': f"{memory_current}\n",
+        'memory.max': f"{memory_max}\n",
+        'io.stat': f"8:0 rbytes={rbytes // 2} wbytes={wbytes} rios=0 wios=0\n"
+                   f"8:16 rbytes={rbytes - rbytes // 2} wbytes=0 rios=0 wios=0\n",
+        'cpu.pressure': f"some avg10={pressure[0]:.2f} avg60=0.00 avg300=0.00 total=0\n"
+                        f"full avg10={pressure[1]:.2f} avg60=0.00 avg300=0.00 total=0\n",
+    }
+    for name, content in files.items():
+        # Rewrite in place so descriptors held by the reader see the new content
+        with open(os.path.join(path, name), 'w') as f:
+            f.write(content)
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Deterministic monotonic clock for rate calculations"""
+    now = [1000.0]
+    monkeypatch.setattr(core.cgroup.time, 'monotonic', lambda: now[0])
+    return now
+
+def make_collector(root, cgroups):
+    return CgroupMetricsCollector(cgroups, root=str(root), host_memory=HOST_MEMORY)
+
+def collect(collector):
+    return {m.cgroup: m for m in asyncio.run(collector.collect())}
+
+def test_cpu_max_quota(tmp_path, clock):
+    write_cgroup(tmp_path / 'limited', cpu_max="50000 100000")
+    write_cgroup(tmp_path / 'unlimited', cpu_max="max 100000")
+    collector = make_collector(tmp_path, ['limited', 'unlimited'])
+    try:
+        metrics = collect(collector)
+    finally:
+        collector.close()
+
+    assert metrics['limited'].cpu_limit == 0.5
+    assert metrics['unlimited'].cpu_limit == float(os.cpu_count() or 1)
+
+def test_memory_limit(tmp_path, clock):
+    write_cgroup(tmp_path / 'limited', memory_current=1048576, memory_max="2097152")
+    write_cgroup(tmp_path / 'unlimited', memory_current=HOST_MEMORY // 4, memory_max="max")
+    collector = make_collector(tmp_path, ['limited', 'unlimited'])
+    try:
+        metrics = collect(collector)
+    finally:
+        collector.close()
+
+    assert metrics['limited'].memory_max == 2097152
+    assert metrics['limited'].memory_percent == 50.0
+    assert metrics['unlimited'].memory_max is None
+    assert metrics['unlimited'].memory_percent == 25.0
+
+def test_cpu_and_io_deltas(tmp_path, clock):
+    cgroup = tmp_path / 'app'
+    write_cgroup(cgroup, cpu_usage_usec=1_000_000, cpu_max="50000 100000")
+    collector = make_collector(tmp_path, ['app'])
+    try:
+        first = collect(collector)['app']
+        assert first.cpu_percent == 0.0
+        assert first.io_read == first.io_write == 0.0
+
+        # 0.25s of CPU over 1s against a 0.5 CPU quota is 50% of the quota
+        clock[0] += 1.0
+        write_cgroup(cgroup, cpu_usage_usec=1_250_000, cpu_max="50000 100000",
+                     rbytes=2 * 1024 * 1024, wbytes=1024 * 1024)
+        second = collect(collector)['app']
+    finally:
+        collector.close()
+
+    assert second.cpu_percent == pytest.approx(50.0)
+    assert second.io_read == pytest.approx(2.0)
+    assert second.io_write == pytest.approx(1.0)
+
+def test_cpu_pressure(tmp_path, clock):
+    write_cgroup(tmp_path / 'app', pressure=(12.34, 5.5))
+    collector = make_collector(tmp_path, ['app'])
+    try:
+        metrics = collect(collector)['app']
+    finally:
+        collector.close()
+
+    assert metrics.cpu_pressure_some == pytest.approx(12.34)
+    assert metrics.cpu_pressure_full == pytest.approx(5.5)
+
+def test_current_cgroup(tmp_path):
+    proc = tmp_path / 'cgroup'
+    proc.write_text("0::/system.slice/app.service\n")
+    assert current_cgroup(str(proc)) == '/system.slice/app.service'
+
+    collector = CgroupMetricsCollector(root=str(tmp_path), proc_path=str(proc),
+                                       host_memory=HOST_MEMORY)
+    assert collector.cgroups == ['/system.slice/app.service']
+    collector.close()
+
+def test_current_cgroup_without_v2_entry(tmp_path):
+    proc = tmp_path / 'cgroup'
+    proc.write_text("12:memory:/docker/abc\n")
+    with pytest.raises(ValueError):
+        current_cgroup(str(proc))
+
+def test_malformed_cgroup_does_not_block_others(tmp_path, clock):
+    write_cgroup(tmp_path / 'good')
+    write_cgroup(tmp_path / 'bad')
+    (tmp_path / 'bad' / 'cpu.stat').write_text("garbage line here\n")
+    collector = make_collector(tmp_path, ['good', 'bad'])
+    try:
+        metrics = collect(collector)
+    finally:
+        collector.close()
+
+    assert list(metrics) == ['good']
+
+def test_reopen_after_removal(tmp_path, clock, monkeypatch, caplog):
+    cgroup = tmp_path / 'app'
+    write_cgroup(cgroup, cpu_usage_usec=1_000_000)
+    collector = make_collector(tmp_path, ['app'])
+    try:
+        assert 'app' in collect(collector)
+
+        # On cgroupfs, reads through descriptors of a removed cgroup fail with ENODEV
+        shutil.rmtree(cgroup)
+        pread = os.pread
+        def removed_pread(fd, size, offset):
+            raise OSError(errno.ENODEV, os.strerror(errno.ENODEV))
+        monkeypatch.setattr(core.cgroup.os, 'pread', removed_pread)
+        assert collect(collector) == {}
+        monkeypatch.setattr(core.cgroup.os, 'pread', pread)
+
+        # While missing it is skipped on every tick, but only warned about once
+        assert collect(collector) == {}
+        warnings = [r for r in caplog.records if r.levelname == 'WARNING']
+        assert len(warnings) == 1
+
+        # Once recreated it is reopened with fresh counters
+        write_cgroup(cgroup, cpu_usage_usec=5_000_000, memory_current=4096)
+        metrics = collect(collector)['app']
+        assert metrics.memory_current == 4096
+        assert metrics.cpu_percent == 0.0
+    finally:
+        collector.close()
+
+def test_failing_pressure_keeps_other_metrics(tmp_path, clock, monkeypatch):
+    cgroup = tmp_path / 'app'
+    write_cgroup(cgroup, cpu_usage_usec=1_000_000, memory_current=1048576)
+    pread = os.pread
+
+    # With PSI disabled, cpu.pressure exists but reading it fails with EOPNOTSUPP
+    def psi_disabled_pread(fd, size, offset):
+        if os.readlink(f'/proc/self/fd/{fd}').endswith('cpu.pressure'):
+            raise OSError(errno.EOPNOTSUPP, os.strerror(errno.EOPNOTSUPP))
+        return pread(fd, size, offset)
+    monkeypatch.setattr(core.cgroup.os, 'pread', psi_disabled_pread)
+
+    collector = make_collector(tmp_path, ['app'])
+    try:
+        first = collect(collector)['app']
+        clock[0] += 1.0
+        write_cgroup(cgroup, cpu_usage_usec=1_250_000, memory_current=1048576)
+        second = collect(collector)['app']
+    finally:
+        collector.close()
+
+    assert first.cpu_pressure_some is None and first.cpu_pressure_full is None
+    assert second.cpu_pressure_some is None
+    # The reader is kept, so CPU deltas carry over between ticks
+    assert second.cpu_percent == pytest.approx(50.0)
+    assert second.memory_current == 1048576
+    assert second.memory_percent == 50.0
+
+def test_disabled_controllers_are_none(tmp_path, clock):
+    cgroup = tmp_path / 'app'
+    write_cgroup(cgroup)
+    for name in ('memory.current', 'memory.max', 'io.stat', 'cpu.pressure'):
+        os.remove(cgroup / name)
+    collector = make_collector(tmp_path, ['app'])
+    try:
+        metrics = collect(collector)['app']
+    finally:
+        collector.close()
+
+    assert metrics.cpu_percent == 0.0
+    assert metrics.memory_current is None
+    assert metrics.memory_percent is None
+    assert metrics.io_read is None and metrics.io_write is None
+    assert metrics.cpu_pressure_some is None
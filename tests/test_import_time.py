@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+# psutil is required by the collector itself; without it `import main` cannot run
+pytest.importorskip('psutil')
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must never be loaded when importing the collector path
+HEAVY_MODULES = ('tkinter', 'matplotlib', 'seaborn', 'numpy', 'aiosqlite')
+
+# Cumulative import budget in microseconds for the collector entry points.
+# Baseline is the best of IMPORT_RUNS cold imports with psutil 7.2 on CPython 3.11:
+# main ~71ms (mostly asyncio) and core.monitor ~16ms. Each budget allows 2x that
+# plus a fixed allowance, so regressions fail long before the UI stack comes back.
+IMPORT_BUDGET_US = {
+    'main': 2 * 71_000 + 20_000,
+    'core.monitor': 2 * 16_000 + 10_000,
+}
+
+# Take the fastest of several runs to smooth out scheduler and disk cache noise
+IMPORT_RUNS = 3
+
+def import_times(module: str, cwd: str) -> Dict[str, int]:
+    """Import a module in a fresh interpreter and return cumulative import times"""
+    pythonpath = os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get('PYTHONPATH')]))
+    env = dict(os.environ, PYTHONPATH=pythonpath, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+@pytest.fixture(scope='module')
+def main_import_times(tmp_path_factory) -> Dict[str, int]:
+    # main configures a log file in the working directory, so keep it out of the tree
+    cwd = str(tmp_path_factory.mktemp('importtime'))
+    best: Dict[str, int] = {}
+    for _ in range(IMPORT_RUNS):
+        for name, cumulative in import_times('main', cwd).items():
+            best[name] = min(cumulative, best.get(name, cumulative))
+    return best
+
+@pytest.mark.parametrize('module', HEAVY_MODULES)
+def test_heavy_modules_not_imported(main_import_times, module):
+    loaded = [name for name in main_import_times if name.split('.')[0] == module]
+    assert not loaded, f"{module} imported at startup: {loaded}"
+
+@pytest.mark.parametrize('module,budget', IMPORT_BUDGET_US.items())
+def test_import_budget(main_import_times, module, budget):
+    assert module in main_import_times
+    assert main_import_times[module] < budget, (
+        f"{module} took {main_import_times[module]}us to import (budget {budget}us)"
+    )
@@ -3,14 +3,16 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import logging
-from core.monitor import SystemMonitor
-from storage.repository import MetricsRepository
+from typing import TYPE_CHECKING
 import seaborn as sns
 from matplotlib.gridspec import GridSpec
-import numpy as np
+
+if TYPE_CHECKING:
+    from core.monitor import SystemMonitor
+    from storage.repository import MetricsRepository
 
 class Dashboard:
-    def __init__(self, monitor: SystemMonitor, repository: MetricsRepository):
+    def __init__(self, monitor: 'SystemMonitor', repository: 'MetricsRepository'):
         logging.info("Initializing Dashboard...")
         self.monitor = monitor
         self.repository = repository